@@ -14,31 +14,38 @@
 ### Documentation for BAR:
 #     https://github.com/choderalab/pymbar/blob/master/pymbar/bar.py
 
-### If ValueError is returned during plot when startStep is specified,
-#     make sure (-e and -t) matches range of (startStep to end).
-#     E.g., `-e 4 -t 5 -s 1999000`
-
 from pymbar import BAR
 from pymbar import timeseries
 import numpy as np
+import matplotlib
+matplotlib.use('Agg') # figures are only ever saved, never shown; Agg also
+                      # keeps the background plot processes GUI-free
 import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
-import re,os,sys,glob
+import re,os,sys,glob,io,shutil,mmap,hashlib
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process
+
+# numba is optional: used to JIT-compile the fepout tokenizer if available
+try:
+   from numba import njit
+   HAVE_NUMBA = True
+except ImportError:
+   HAVE_NUMBA = False
 
 # ------------------------- Functions ---------------------------- #
 
+numbers = re.compile(r'(\d+)') # compiled once, reused for every filename
+
 
 def numericalSort(value):
 
    """
-   Parses some number. 5 would return ['5']. 5.4 would return ['5', '4'].
+   Splits a value into alternating text and integer parts so filenames
+      sort in numeric order, e.g. 'fep5.out' -> ('fep', 5, '.out').
 
    """
-   numbers = re.compile(r'(\d+)') # parses a given value
-   parts = numbers.split(value)
-   parts[1::2] = list(map(int, parts[1::2]))
-   return parts
+   return tuple(int(s) if s.isdigit() else s for s in numbers.split(value))
 
 
 def cat_fepout(fep_dir, label, D):
@@ -65,26 +72,214 @@ def cat_fepout(fep_dir, label, D):
    #outfile = fep_dir.split('/')[-1]+'_{}.fepout'.format(D)
    outfile =  '{}_{}.fepout'.format(label, D)
 
-   # don't write file if already exists
-   if os.path.exists(outfile):
-      print("!!! WARNING: {} already exists".format(outfile))
-      return outfile
-
-   # loop through all *.fepout files and write to the summary file
-   with open(outfile, 'w') as output:
+   # key the summary file on its inputs (names, mtimes, sizes) via a
+   #    sidecar .meta file, so a stale concatenation is rebuilt instead
+   #    of silently reused when any *.fepout changed
+   meta = hashlib.sha256(repr([(f, os.path.getmtime(f), os.path.getsize(f))
+                               for f in fep_file]).encode()).hexdigest()
+   metafile = outfile+'.meta'
+
+   # don't rewrite the file if it exists and its inputs are unchanged
+   if os.path.exists(outfile) and os.path.exists(metafile):
+      with open(metafile) as m:
+         if m.read() == meta:
+            print("!!! WARNING: {} already exists".format(outfile))
+            return outfile
+
+   # hint the kernel to start readahead on every input up front so the
+   #    sequential per-file reads below overlap with I/O already in flight
+   if hasattr(os, 'posix_fadvise'):
+      for fname in fep_file:
+         fd = os.open(fname, os.O_RDONLY)
+         try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+         finally:
+            os.close(fd)
+
+   # loop through all *.fepout files and stream to the summary file
+   #    in 1 MiB chunks so peak memory stays flat
+   with open(outfile, 'wb') as output:
       print('Concatenating {}'.format(outfile))
       for fname in fep_file:
          #print(fname)
-         with open(fname) as infile:
-            output.write(infile.read())
+         with open(fname, 'rb') as infile:
+            shutil.copyfileobj(infile, output, 1024*1024)
+
+   # record the input state this summary file was built from
+   with open(metafile, 'w') as m:
+      m.write(meta)
 
    return outfile
 
 
+if HAVE_NUMBA:
+
+   # no fastmath here: it would let LLVM assume no NaNs/Infs and fold the
+   #    nan/inf returns below into garbage
+   @njit(cache=True, nogil=True)
+   def _atof(buf, i, end):
+
+      """
+      Parse one float token from byte buffer buf starting at i.
+      Returns (value, index one past the token). Handles sign,
+         decimals, e/E exponents and nan/inf as written by NAMD.
+      A token it cannot parse returns with the index unchanged;
+         the caller must treat that as an error.
+
+      """
+      i0 = i
+      sign = 1.0
+      if buf[i] == 45:   # '-'
+         sign = -1.0
+         i += 1
+      elif buf[i] == 43: # '+'
+         i += 1
+      # nan/inf tokens (unstable runs print these; float() accepts them)
+      c = buf[i] | 32 # lowercase
+      if c == 110: # 'n'
+         if i+2 < end and (buf[i+1] | 32) == 97 and (buf[i+2] | 32) == 110: # 'an'
+            return sign*np.nan, i+3
+      elif c == 105: # 'i'
+         if i+2 < end and (buf[i+1] | 32) == 110 and (buf[i+2] | 32) == 102: # 'nf'
+            return sign*np.inf, i+3
+      # accumulate the full mantissa as an integer, track decimal places
+      mant = 0.0
+      nint = 0
+      ndec = 0
+      while i < end and 48 <= buf[i] <= 57:
+         mant = mant*10.0 + (buf[i]-48)
+         nint += 1
+         i += 1
+      if i < end and buf[i] == 46: # '.'
+         i += 1
+         while i < end and 48 <= buf[i] <= 57:
+            mant = mant*10.0 + (buf[i]-48)
+            ndec += 1
+            i += 1
+      if nint == 0 and ndec == 0:
+         # no digits at all: rewind so the caller sees the bad token
+         return 0.0, i0
+      ex = 0
+      if i < end and (buf[i] == 101 or buf[i] == 69): # 'e' or 'E'
+         i += 1
+         esign = 1
+         if buf[i] == 45:
+            esign = -1
+            i += 1
+         elif buf[i] == 43:
+            i += 1
+         while i < end and 48 <= buf[i] <= 57:
+            ex = ex*10 + (buf[i]-48)
+            i += 1
+         ex *= esign
+      ex -= ndec
+      # divide by the (exact) positive power of ten so short decimals
+      #    round the same way float() does
+      if ex < 0:
+         return sign*mant/10.0**(-ex), i
+      return sign*mant*10.0**ex, i
+
+
+   @njit(cache=True, nogil=True)
+   def _parse_block(buf):
+
+      """
+      Tokenize one window's data block (uint8 buffer) in a single pass.
+      Comment lines ('#...') are skipped; for each FepEnergy line the
+         step, elec(L), elec(L+dL), vdw(L), vdw(L+dL), dE and dG columns
+         are filled into a preallocated (nlines, 7) float64 array, in the
+         same layout as the loadtxt fallback.
+
+      """
+      n = buf.size
+      # first pass: newline count gives an upper bound on data lines
+      nlines = 1
+      for i in range(n):
+         if buf[i] == 10:
+            nlines += 1
+      cols = np.empty((nlines, 7), np.float64)
+
+      row = 0
+      i = 0
+      while i < n:
+         # locate end of line
+         j = i
+         while j < n and buf[j] != 10:
+            j += 1
+         # skip leading whitespace (incl. '\r' from CRLF files)
+         k = i
+         while k < j and (buf[k] == 32 or buf[k] == 9 or buf[k] == 13):
+            k += 1
+         if k < j and buf[k] != 35: # not blank, not a '#' comment
+            tok = 0
+            while k < j:
+               while k < j and (buf[k] == 32 or buf[k] == 9 or buf[k] == 13):
+                  k += 1
+               if k >= j:
+                  break
+               if tok == 0:
+                  # 'FepEnergy:' label, skip the token
+                  while k < j and buf[k] != 32 and buf[k] != 9 and buf[k] != 13:
+                     k += 1
+               else:
+                  val, k2 = _atof(buf, k, j)
+                  if k2 == k:
+                     # unparseable token: fail loudly like the loadtxt
+                     #    fallback instead of spinning on the same byte
+                     raise ValueError("could not parse numeric field in fepout data line")
+                  k = k2
+                  if tok <= 6:
+                     cols[row, tok-1] = val
+                  elif tok == 9:
+                     cols[row, 6] = val
+               tok += 1
+            row += 1
+         i = j+1
+      return cols[:row]
+
+
+if HAVE_NUMBA:
+
+   @njit(cache=True, fastmath=True, nogil=True)
+   def _stat_ineff(x):
+
+      """
+      Statistical inefficiency g = 1 + 2*tau of one timeseries, fusing
+         the mean/variance and per-lag covariance passes in one JIT'd
+         loop. Follows pymbar's estimator: accumulate the normalized
+         autocorrelation weighted by (1 - t/N), stopping once it goes
+         negative past lag 3, and enforce g >= 1.
+
+      """
+      N = x.size
+      mu = 0.0
+      for i in range(N):
+         mu += x[i]
+      mu /= N
+      sigma2 = 0.0
+      for i in range(N):
+         d = x[i]-mu
+         sigma2 += d*d
+      sigma2 /= N
+
+      g = 1.0
+      for t in range(1, N-1):
+         s = 0.0
+         for i in range(N-t):
+            s += (x[i]-mu)*(x[i+t]-mu)
+         C = s/((N-t)*sigma2)
+         if C <= 0.0 and t > 3:
+            break
+         g += 2.0*C*(1.0-t/N)
+      if g < 1.0:
+         g = 1.0
+      return g
+
+
 def ParseFEP( fep_file, startStep=None ):
 
     """
-    Parse summary *.fepout files and return relevant data as dictionaries.
+    Parse summary *.fepout files and return all data as one contiguous array.
 
     Parameters
     ----------
@@ -95,69 +290,87 @@ def ParseFEP( fep_file, startStep=None ):
 
     Returns
     -------
-    dEs_dict: dictionary of all the dE steps for each window (key=window int)
-              40 windows = 40 entries. Each key has x values for x num of steps.
-    dGs_dict: dictionary of all the dG steps for each window (key=window int)
-    window: dictionary of start dLambda and stop dLambda per each window.
-            key is the integer lambda window number.
+    data: ndarray of shape (n_windows, n_steps, 4). The last axis holds,
+          in order: dE, dG, elec difference, vdw difference per step.
+          Downstream consumers slice this one buffer per quantity/window.
+    window: list of the start dLambda and stop dLambda labels per window,
+            indexed by the integer lambda window number.
 
     """
-    dEs_dict = {} # dictionary of all the dE steps for each window (key)
-    dGs_dict = {} # dictionary of all the dG steps for each window (key)
-    elecs_dict = {} # dictionary of all the elec energies for each window (key)
-    vdws_dict = {} # dictionary of all the vdw energies for each window (key)
-    window = {} # dictionary for the dLambda string labels for each window
-    tempDE = [] # temp list to get all dEs in one window
-    tempDG = [] # temp list to get all dGs in one window
-    tempElec = [] # temp list to get all electrostatic energies of one window
-    tempVdw = [] # temp list to get all van der Waals energies of one window
-    parsing = False
-    i = 0
-
-    # open and get data from fep summary file.
-    f = open(fep_file,'r')
-    data = f.readlines()
-    f.close()
-
-    for line in data:
-       l = line.strip().split()
-
-       if '#Free' in l:
-          tempDE_arr = np.asarray(tempDE) # convert tempDE to numpy array
-          tempDG_arr = np.asarray(tempDG) # convert tempDG to numpy array
-          tempElec_arr = np.asarray(tempElec) # convert tempElec to numpy array
-          tempVdw_arr = np.asarray(tempVdw) # convert tempVdw to numpy array
-          dEs_dict[i] = tempDE_arr # put all the dE values in the dictionary
-          dGs_dict[i] = tempDG_arr # put all the dG values in the dictionary
-          elecs_dict[i] = tempElec_arr # put all the dE values in the dictionary
-          vdws_dict[i] = tempVdw_arr # put all the dG values in the dictionary
-          window[i] =  " ".join(l[6:10]) # e.g. grab '[ 0.975 1 ]' join w/space b/t each
-
-          # reset values for the next window of the summary file
-          i +=1
-          tempDE = []
-          tempDG = []
-          tempElec = []
-          tempVdw = []
-          parsing = False
-
-       # append the value in the 'dE' and 'dG' columns of *.fepout file
-       if parsing:
-          tempDE.append(float(l[6]))
-          tempDG.append(float(l[9]))
-          tempElec.append(float(l[3])-float(l[2]))
-          tempVdw.append(float(l[5])-float(l[4]))
-
-       # turn parsing on at section 'STARTING COLLECTION OF ENSEMBLE AVERAGE'
-       if '#STARTING' in l and startStep is None:
-          parsing = True
-       elif startStep==l[1]: 
-          parsing = True
-
-    return dEs_dict, dGs_dict, elecs_dict, vdws_dict, window
-
-
-def DoBAR(fwds, revs, label, verbose):
+    perwin = [] # per-window (n_steps, 4) arrays, stacked at the end
+    window = [] # the dLambda string labels for each window
+
+    # memory-map the summary file: window blocks become byte ranges of
+    #    the mapped buffer instead of slices of one giant Python string
+    with open(fep_file,'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    raw = np.frombuffer(mm, dtype=np.uint8) # zero-copy view for the tokenizer
+
+    pos = 0
+    while True:
+        # each window's data block ends at its '#Free energy change ...' line
+        idx = mm.find(b'\n#Free', pos)
+        if idx == -1:
+            break
+        start, end = pos, idx+1
+        eol = mm.find(b'\n', idx+1)
+        eol = mm.size() if eol == -1 else eol
+        free_line = mm[idx+1:eol].split()
+        window.append(b" ".join(free_line[6:10]).decode()) # e.g. grab '[ 0.975 1 ]' join w/space b/t each
+        pos = eol+1
+
+        # without a startStep, only keep data past section
+        #    'STARTING COLLECTION OF ENSEMBLE AVERAGE'
+        if startStep is None:
+            sidx = mm.find(b'#STARTING', start, end)
+            start = mm.find(b'\n', sidx)+1 if sidx != -1 else end
+
+        # both paths produce the same (n_steps, 7) column layout:
+        #    step, elec(L), elec(L+dL), vdw(L), vdw(L+dL), dE, dG
+        if HAVE_NUMBA:
+            # JIT-compiled single-pass tokenizer over the raw bytes
+            cols = _parse_block(raw[start:end])
+        else:
+            # decode all numeric columns of this window in one C-level pass
+            # (comment lines starting with '#' are skipped by loadtxt)
+            cols = np.loadtxt(io.StringIO(mm[start:end].decode()), usecols=(1,2,3,4,5,6,9), ndmin=2)
+        steps, dE, dG = cols[:,0], cols[:,5], cols[:,6]
+        # elec/vdw differences for the whole window in two vector ops
+        elec = cols[:,2]-cols[:,1]
+        vdw = cols[:,4]-cols[:,3]
+
+        if startStep is not None:
+            # keep only steps past startStep (follows the FepEnergy: column)
+            keep = steps > float(startStep)
+            dE, dG, elec, vdw = dE[keep], dG[keep], elec[keep], vdw[keep]
+
+        perwin.append(np.stack([dE, dG, elec, vdw], axis=-1))
+
+    # release the buffer export before closing the map
+    del raw
+    mm.close()
+
+    # one contiguous (n_windows, n_steps, 4) buffer; windows must have
+    #    equal step counts (see assumptions in the header)
+    return np.stack(perwin), window
+
+
+def _corr_one(value):
+
+    """
+    Correlation analysis for one window: compute the statistical
+       inefficiency, then extract the uncorrelated samples.
+
+    """
+    if HAVE_NUMBA:
+        g = _stat_ineff(value) # JIT'd local kernel, same estimator
+    else:
+        g = timeseries.statisticalInefficiency(value)
+    indices = timeseries.subsampleCorrelatedData(value, g)
+    return g, value[indices]
+
+
+def DoBAR(fwds, revs, pairs, label, verbose):
     """
 
     BAR to combine fwd and rev data of dGs.
@@ -165,8 +378,9 @@ def DoBAR(fwds, revs, label, verbose):
 
     Parameters
     ----------
-    fwds: dictionary of forward work values for each window
-    revs: dictionary of reverse work values for each window
+    fwds: 2D array (n_windows, n_steps) of forward work values per window
+    revs: 2D array (n_windows, n_steps) of reverse work values per window
+    pairs: list of (forward, reverse) window index pairs to combine
     label: string label of what it is (only for printing output)
 
     Returns
@@ -177,50 +391,44 @@ def DoBAR(fwds, revs, label, verbose):
 
     """
 
-    fwd_ss = {} # subsampled version of fwds
-    rev_ss = {} # subsampled version of revs
-    dg_bar = np.zeros([len(fwds)], np.float64)  # allocate storage: dG steps
-    gsd_bar = np.zeros([len(fwds)], np.float64) # allocate storage: dG stdev steps
-    dgs = np.zeros([len(fwds)], np.float64)     # allocate storage: dG accumulated
-    gsdlist = np.zeros([len(fwds)], np.float64) # allocate storage: dG stdev accum
+    numWins = len(fwds)
+    dg_bar = np.zeros([numWins], np.float64)  # allocate storage: dG steps
+    gsd_bar = np.zeros([numWins], np.float64) # allocate storage: dG stdev steps
+    dgs = np.zeros([numWins], np.float64)     # allocate storage: dG accumulated
+    gsdlist = np.zeros([numWins], np.float64) # allocate storage: dG stdev accum
 
 
-    #corr_time = np.zeros([len(fwds)], np.float64)
+    #corr_time = np.zeros([numWins], np.float64)
     corr_time = {}
-    for key, value in fwds.items(): # this notation changes in python3: http://tinyurl.com/j3uq3me
-        # compute correlation time
-        g = timeseries.statisticalInefficiency(value)
-        corr_time[key] = [g]
-        # compute indices of UNcorrelated timeseries, then extract those samples
-        indices = timeseries.subsampleCorrelatedData(value, g)
-        fwd_ss[key] = value[indices]
-
-    for key, value in revs.items(): # this notation changes in python3: http://tinyurl.com/j3uq3me
-        # compute correlation time
-        g = timeseries.statisticalInefficiency(value)
-        corr_time[key].append(g)
-        # compute indices of UNcorrelated timeseries, then extract those samples
-        indices = timeseries.subsampleCorrelatedData(value, g)
-        rev_ss[key] = value[indices]
+    # windows are independent, so run the correlation analyses across a
+    #    thread pool (pymbar's numpy kernels release the GIL)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        fwd_res = list(ex.map(_corr_one, fwds))
+        rev_res = list(ex.map(_corr_one, revs))
+    fwd_ss = [ss for g, ss in fwd_res] # subsampled version of fwds
+    rev_ss = [ss for g, ss in rev_res] # subsampled version of revs
+    for key in range(numWins):
+        corr_time[key] = [fwd_res[key][0], rev_res[key][0]]
+
+    # then apply BAR estimator to get dG for each step; the window pairs
+    #    are independent, so they go through the thread pool as well
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        bar_res = list(ex.map(lambda p: BAR(fwd_ss[p[0]], rev_ss[p[1]]), pairs))
+    for (kF, kR), (dg, gsd) in zip(pairs, bar_res):
+        dg_bar[kF], gsd_bar[kF] = dg, gsd
 
     bar = {}
-    # then apply BAR estimator to get dG for each step
-    for kF, kR in zip(sorted(fwd_ss.keys()), sorted(list(rev_ss.keys()), reverse=True)):
-        dg_bar[kF], gsd_bar[kF] = BAR(fwd_ss[kF],rev_ss[kR])
-        bar[kF] = [ np.sum(dg_bar), dg_bar[kF], gsd_bar[kF] ]
+    running = np.cumsum(dg_bar) # net dG up to and including each window
+    for kF, kR in pairs:
+        bar[kF] = [ running[kF], dg_bar[kF], gsd_bar[kF] ]
 
     # calculate the net dG standard deviation = sqrt[ sum(s_i^2) ]
-    gsd = (np.sum(np.power(gsd_bar, 2)))**0.5
+    gsd = np.sqrt(np.square(gsd_bar).sum()) # np.square beats the generic pow ufunc
 
-    net = 0.
-    netsd = 0.
-    for i, g in enumerate(dg_bar):
-        # accumulate net dGs into running sums (plot this)
-        dgs[i] = dg_bar[i] + net
-        net = dgs[i]
-        # combine the stdevs: s = sqrt(s1^2 + s2^2 + ...)
-        gsdlist[i] = ((gsd_bar[i])**2.+(netsd)**2.)**0.5
-        netsd = gsdlist[i]
+    # accumulate net dGs into running sums (plot this)
+    dgs[:] = np.cumsum(dg_bar)
+    # combine the stdevs: s = sqrt(s1^2 + s2^2 + ...)
+    gsdlist[:] = np.sqrt(np.cumsum(np.square(gsd_bar)))
 
 
     if verbose == True:
@@ -243,7 +451,7 @@ def DoBAR(fwds, revs, label, verbose):
     return dgs, gsdlist
 
 
-def hist_plot(w_F, w_R, window_F, window_R, title, outfname):
+def hist_plot(w_F, w_R, window_F, window_R, pairs, title, outfname):
 
     """
     Plot probability histogram overlap of all windows. 
@@ -251,42 +459,49 @@ def hist_plot(w_F, w_R, window_F, window_R, title, outfname):
     Parameters
     ----------
 
-    w_F: dictionary of all the dEs for all windows going forward (key=window number)
-    w_R: dictionary of all the dEs for all windows going backward (key=window number)
+    w_F: 2D array of all the dEs for all windows going forward (row=window number)
+    w_R: 2D array of all the dEs for all windows going backward (row=window number)
          Note - based on how FEP calcns are conducted with F and R, need to loop
-                over this list in reverse. Aka last of w_R goes with first of w_F.
-    window_*: dictionary of start dLambda and stop dLambda per each window.
-            key is the integer lambda window number.
+                over this array in reverse. Aka last of w_R goes with first of w_F.
+    window_*: list of start dLambda and stop dLambda labels per each window,
+            indexed by the integer lambda window number.
+    pairs: list of (forward, reverse) window index pairs to overlay
     title: string name of the main title over all windows
     outfname: string name of the image to be saved
 
     """
 
-    numWins = len(w_F.keys())
-    if numWins == 40: gs = gridspec.GridSpec(8,5)
-    elif numWins == 20: gs = gridspec.GridSpec(5,4)
+    numWins = len(w_F)
+    if numWins == 40: nrows, ncols = 8,5
+    elif numWins == 20: nrows, ncols = 5,4
     else: print("ERROR: specified number of windows is not currently supported (only 20 or 40)")
 
-    idx = 0
-    plt.figure()
+    # create the whole grid of axes in one call, then index the Axes
+    #    objects directly instead of going through the pyplot state
+    #    machine once per subplot
+    fig, axes = plt.subplots(nrows, ncols)
 
-    for kF, kR in zip(sorted(w_F.keys()), sorted(list(w_R.keys()), reverse=True)):
+    idx = 0
+    for kF, kR in pairs:
         # set subplot titles based on the dLambda label
 #        sbtitle = 'F: %s, R: %s' % (window_F[kF], window_R[kR])
         temp = window_F[kF].split(' ') # only uses F. both sets SHOULD match...
         sbtitle = '$\lambda$ = %s to %s' % (temp[1], temp[2])
 
-        # create subplot
-        plt.subplot(gs[idx])
-        # plot reverse and forward data for this window
-        plt.hist((-1* w_R[kR] ), bins=100, color='r',histtype='step')
-        plt.hist(w_F[kF], bins=100, color='b', histtype='step')
+        ax = axes.flat[idx]
+        # plot reverse and forward data for this window: bin at C level
+        #    with np.histogram, then draw the step outlines directly
+        #    (skips plt.hist's per-bin Patch construction)
+        countsR, edgesR = np.histogram(-1* w_R[kR], bins=100)
+        countsF, edgesF = np.histogram(w_F[kF], bins=100)
+        ax.stairs(countsR, edgesR, color='r')
+        ax.stairs(countsF, edgesF, color='b')
         # add title and ticks for this window
-        plt.title(sbtitle, fontsize=8, color='g')
-        plt.tick_params(axis='both',labelsize=6)
+        ax.set_title(sbtitle, fontsize=8, color='g')
+        ax.tick_params(axis='both',labelsize=6)
         idx += 1
-    plt.subplots_adjust(bottom=-1.15,top=1.15,hspace=0.6,wspace=0.3,right=1.3)
-    plt.suptitle(title,x=0.7,y=1.3)
+    fig.subplots_adjust(bottom=-1.15,top=1.15,hspace=0.6,wspace=0.3,right=1.3)
+    fig.suptitle(title,x=0.7,y=1.3)
 
     ### super-axis labels. locations are very finicky and likely need adjusting
 #    if numWins == 40:
@@ -299,61 +514,64 @@ def hist_plot(w_F, w_R, window_F, window_R, title, outfname):
     plt.clf()
 
 
-def dg_plot(dGs_F, dGs_R, window_F, window_R, eqTime, totTime, title, outfname):
+def dg_plot(dGs_F, dGs_R, window_F, window_R, pairs, eqTime, totTime, title, outfname):
 
     """
-    Plot deltaG for all windows. Based on assumption of 2 fs/step and
-        alchOutFreq = 1000 so that each ns has 500 samples.
+    Plot deltaG for all windows. The time axis spans eqTime to totTime
+        over however many samples each window actually has.
 
     Parameters
     ----------
-    dGs_F: dictionary of all the dGs for all windows going forward (key=window number)
-    dGs_R: dictionary of all the dGs for all windows going backward (key=window number)
+    dGs_F: 2D array of all the dGs for all windows going forward (row=window number)
+    dGs_R: 2D array of all the dGs for all windows going backward (row=window number)
          Note - based on how FEP calcns are conducted with F and R, need to loop
-                over this list in reverse. Aka last of w_R goes with first of w_F.
+                over this array in reverse. Aka last of w_R goes with first of w_F.
     eqTime: float value of how many ns of equilibration per window (based on alchEquilSteps)
     totTime: float value of total sim time per window including eqTime (based on runFEP nSteps)
-    window_*: dictionary of start dLambda and stop dLambda per each window.
-            key is the integer lambda window number.
+    window_*: list of start dLambda and stop dLambda labels per each window,
+            indexed by the integer lambda window number.
+    pairs: list of (forward, reverse) window index pairs to overlay
     title: string name of the main title over all 40 windows
     outfname: string name of the image to be saved
 
     """
 
-    numWins = len(dGs_F.keys())
-    if numWins == 40: gs = gridspec.GridSpec(8,5)
-    elif numWins == 20: gs = gridspec.GridSpec(5,4)
+    numWins = len(dGs_F)
+    if numWins == 40: nrows, ncols = 8,5
+    elif numWins == 20: nrows, ncols = 5,4
     else: print("ERROR: specified number of windows is not currently supported (only 20 or 40)")
 
-    ### generate ns steps for x-axis
-    step=(totTime-eqTime)/((totTime-eqTime)*500.)
-    ns=np.arange(eqTime,totTime+step,step)
+    ### generate ns steps for x-axis from the actual number of samples
+    ###    per window, rather than assuming 500 samples per ns
+    ns=np.linspace(eqTime,totTime,dGs_F.shape[1])
 
-    idx = 0
-    plt.figure()
+    # create the whole grid of axes in one call, then index the Axes
+    #    objects directly instead of going through the pyplot state
+    #    machine once per subplot
+    fig, axes = plt.subplots(nrows, ncols)
 
-    for kF, kR in zip(sorted(dGs_F.keys()), sorted(list(dGs_R.keys()), reverse=True)):
+    idx = 0
+    for kF, kR in pairs:
         # set subplot titles based on the dLambda label
 #        sbtitle = 'F: %s, R: %s' % (window_F[kF], window_R[kR]) # check matching windows
         temp = window_F[kF].split(' ') # only uses F. both sets SHOULD match...
         sbtitle = '$\lambda$ = %s to %s' % (temp[1], temp[2])
 
-        # create subplot
-        plt.subplot(gs[idx])
+        ax = axes.flat[idx]
         # plot reverse and forward data for this window
-        plt.plot(ns, -1*dGs_R[kR], color='r')
-        plt.plot(ns, dGs_F[kF], color='b')
+        ax.plot(ns, -1*dGs_R[kR], color='r')
+        ax.plot(ns, dGs_F[kF], color='b')
         # add title and ticks for this window
-        plt.title(sbtitle, fontsize=8, color='g')
-        plt.tick_params(axis='both',labelsize=5)
+        ax.set_title(sbtitle, fontsize=8, color='g')
+        ax.tick_params(axis='both',labelsize=5)
         # adjust x-axis for this window
-        x1,x2,y1,y2 = plt.axis()
-        plt.axis((min(ns),max(ns),y1,y2))
-        plt.grid()
+        x1,x2,y1,y2 = ax.axis()
+        ax.axis((min(ns),max(ns),y1,y2))
+        ax.grid()
         idx += 1
 
-    plt.subplots_adjust(bottom=-1.15,top=1.15,hspace=0.6,wspace=0.3,right=1.3)
-    plt.suptitle(title,x=0.7,y=1.3)
+    fig.subplots_adjust(bottom=-1.15,top=1.15,hspace=0.6,wspace=0.3,right=1.3)
+    fig.suptitle(title,x=0.7,y=1.3)
 
     ### super-axis labels. locations are very finicky and likely need adjusting
 #    if numWins == 40:
@@ -431,40 +649,61 @@ def main(**kwargs):
         hdir = src+'/FEP_{}/results'.format(D)
         if os.path.exists(hdir) == True:
             fepout = cat_fepout(hdir, 'results', D)
-            (w_D, dGs_D, elecs_D, vdws_D, window_D) = ParseFEP(fepout, args.startStep)
+            (data_D, window_D) = ParseFEP(fepout, args.startStep)
         else:
             raise OSError("No such file or directory '{}'".format(hdir))
-        return (w_D, dGs_D, elecs_D, vdws_D, window_D)
+        return (data_D, window_D)
 
-    (w_F, dGs_F, elecs_F, vdws_F, window_F) = getdata('F')
-    (w_R, dGs_R, elecs_R, vdws_R, window_R) = getdata('R')
+    # data_* holds (n_windows, n_steps, 4): dE, dG, elec, vdw on the last axis
+    (data_F, window_F) = getdata('F')
+    (data_R, window_R) = getdata('R')
+    numWins = data_F.shape[0]
+    # forward window k combines with reverse window numWins-1-k; compute
+    #    the pairing once and hand it to every consumer
+    pairs = list(zip(range(numWins), reversed(range(numWins))))
 
     ### BAR analysis to combine fwd and rev windows for dG, elec, vdW
-    alls = np.zeros(shape=(3, len(dGs_F))) # actual lists will be shorter bc subsampled
-    sds = np.zeros(shape=(3, len(dGs_F)))
+    alls = np.zeros(shape=(3, numWins)) # actual lists will be shorter bc subsampled
+    sds = np.zeros(shape=(3, numWins))
 
     if opt['decomp'] == True:
-        alls[2], sds[2] = DoBAR(vdws_F, vdws_R, 'VdW', opt['verbose'])
-        alls[1], sds[1] = DoBAR(elecs_F, elecs_R, 'Elec', opt['verbose'])
-        alls[0], sds[0] = DoBAR(w_F, w_R, 'Total', opt['verbose'])
+        alls[2], sds[2] = DoBAR(data_F[:,:,3], data_R[:,:,3], pairs, 'VdW', opt['verbose'])
+        alls[1], sds[1] = DoBAR(data_F[:,:,2], data_R[:,:,2], pairs, 'Elec', opt['verbose'])
+        alls[0], sds[0] = DoBAR(data_F[:,:,0], data_R[:,:,0], pairs, 'Total', opt['verbose'])
     else:
-        alls[0], sds[0] = DoBAR(w_F, w_R, 'Total', opt['verbose'])
+        alls[0], sds[0] = DoBAR(data_F[:,:,0], data_R[:,:,0], pairs, 'Total', opt['verbose'])
 
     ### Plot results.
     if opt['plot'] == True:
 
+        ### render each figure in its own background process: EPS
+        ### serialization is independent work, so overlap it
+        procs = []
+
+        ### single precision is plenty for histograms and traces, and
+        ### halves what the plot processes receive and walk; BAR above
+        ### keeps the float64 data
+        plot_F = data_F.astype(np.float32)
+        plot_R = data_R.astype(np.float32)
+
         ### Plot probability distributions and energies of fwd and rev.
         print("   Plotting probability distributions...")
         title = 'Energy (dU) Histogram Overlap\nblue = forward | red = reverse'
-        hist_plot(w_F, w_R, window_F, window_R, title, opt['outfname'])
+        procs.append(Process(target=hist_plot, args=(plot_F[:,:,0], plot_R[:,:,0], window_F, window_R, pairs, title, opt['outfname'])))
         title = 'Free energy (dG) vs. time (ns)\nblue = forward | red = reverse'
-        dg_plot(dGs_F, dGs_R, window_F, window_R, float(args.eqTime), float(args.totTime), title, opt['outfname'])
+        procs.append(Process(target=dg_plot, args=(plot_F[:,:,1], plot_R[:,:,1], window_F, window_R, pairs, float(args.eqTime), float(args.totTime), title, opt['outfname'])))
 
         ### plot BAR summary results
         print("   Plotting free energies...")
         title = "Free energy change over $\lambda$"
-        gbar_plot(alls[0], sds[0], title, opt['outfname'])
-        if opt['decomp'] == True: pieces_plot(alls, title, opt['outfname'])
+        procs.append(Process(target=gbar_plot, args=(alls[0], sds[0], title, opt['outfname'])))
+        if opt['decomp'] == True:
+            procs.append(Process(target=pieces_plot, args=(alls, title, opt['outfname'])))
+
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
 
 
 